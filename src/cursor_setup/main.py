@@ -7,157 +7,622 @@ Features smart caching and self-upgrade capabilities.
 
 Version: 2.1.0
 """
-import subprocess
+import json
+import os
 import sys
+import time
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import IO, TYPE_CHECKING, Iterator, Optional
 
-import requests
 import typer
 from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
-from rich.text import Text
 
+from cursor_setup import __version__
 from cursor_setup.templates import TEMPLATES
 
-# Initialize Typer app and Rich console
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    import requests
+
+# Heavy modules (requests, rich renderables, subprocess) are imported inside
+# the functions that need them so that `--help` and cache hits start fast.
+
+# Initialize Typer app
 app = typer.Typer(
     name="cursor-setup",
     help="🚀 Initialize your Cursor AI context in seconds.",
     add_completion=False,
 )
-console = Console()
 
 # Constants
 CURSORRULES_FILENAME = ".cursorrules"
 REMOTE_REGISTRY_URL = "https://raw.githubusercontent.com/ThanhNguyxn/cursor-setup/main/rules.json"
 REQUEST_TIMEOUT = 5  # seconds
-CACHE_DIR = Path.home() / ".cursor-setup" / "cache"
+IO_BUFFER_SIZE = 128 * 1024  # bytes, larger than the 8 KiB io default
+REGISTRY_CACHE_FILENAME = "registry.json"
+REGISTRY_ETAG_FILENAME = "registry.etag"
+REGISTRY_CACHE_TTL = 3600  # seconds
+PYPI_PACKAGE_URL = "https://pypi.org/pypi/cursor-setup/json"
+
+
+@lru_cache(maxsize=1)
+def get_console() -> Console:
+    """
+    Get the shared Rich console, created on first use.
+
+    When stdout is not a terminal (pipes, CI logs) or NO_COLOR is set,
+    colors and syntax highlighting are disabled so Rich skips styling work.
+    Markup is still parsed so tags never leak into plain output.
+
+    Returns:
+        The Rich console used for all CLI output.
+    """
+    if not sys.stdout.isatty() or "NO_COLOR" in os.environ:
+        return Console(no_color=True, highlight=False)
+    return Console()
+
+
+@lru_cache(maxsize=1)
+def get_session() -> "requests.Session":
+    """
+    Get the shared HTTP session used for all network requests.
+
+    Reusing one session keeps connections alive between the registry fetch
+    and template downloads, saving a TCP connect and TLS handshake per request.
+
+    Returns:
+        A requests.Session with connection pooling and retries on 5xx gateways.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers["User-Agent"] = f"cursor-setup/{__version__}"
+    retry = Retry(
+        total=2,
+        connect=0,
+        read=0,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        # A 503's Retry-After may ask for hours; never sleep longer than backoff
+        respect_retry_after_header=False,
+    )
+    session.mount(
+        "https://",
+        HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry),
+    )
+    return session
+
+
+@lru_cache(maxsize=1)
+def get_cache_dir() -> Path:
+    """
+    Get the cache directory, resolved on first use.
+
+    Resolving the home directory lazily keeps it off the `--help` path.
+
+    Returns:
+        Path to the cache directory (~/.cursor-setup/cache).
+    """
+    return Path.home() / ".cursor-setup" / "cache"
 
 
 def get_cache_path(name: str) -> Path:
     """
     Get the cache file path for a template.
-    
+
     Args:
         name: Template name (e.g., 'python', 'react').
         
     Returns:
         Path to the cache file.
     """
-    return CACHE_DIR / f"{name}.cursorrules"
+    return get_cache_dir() / f"{name}.cursorrules"
+
+
+def get_cache_meta_path(name: str) -> Path:
+    """
+    Get the path of the HTTP metadata sidecar for a cached template.
+
+    Args:
+        name: Template name (e.g., 'python', 'react').
+        
+    Returns:
+        Path to the sidecar file holding the display name and HTTP validators.
+    """
+    return get_cache_dir() / f"{name}.meta"
+
+
+def get_registry_cache_path() -> Path:
+    """
+    Get the path of the cached remote registry.
+
+    Returns:
+        Path to the cached rules.json.
+    """
+    return get_cache_dir() / REGISTRY_CACHE_FILENAME
 
 
 def ensure_cache_dir() -> None:
     """Create cache directory if it doesn't exist."""
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    get_cache_dir().mkdir(parents=True, exist_ok=True)
+
+
+def is_template_key(name: str) -> bool:
+    """
+    Check that a template name is a plain registry key.
+
+    Names are used as cache file names, so anything that could escape the
+    cache directory (path separators, '..', NUL bytes) is rejected.
+
+    Args:
+        name: Template name as given by the user or the registry.
+        
+    Returns:
+        True if the name is safe to use as a cache key.
+    """
+    return bool(name) and not any(part in name for part in ("/", "\\", "..", "\0"))
 
 
 def load_from_cache(name: str) -> Optional[str]:
     """
     Load template content from cache.
-    
+
     Args:
         name: Template name.
         
     Returns:
         Cached content if exists, None otherwise.
     """
-    cache_path = get_cache_path(name)
-    if cache_path.exists():
-        try:
-            return cache_path.read_text(encoding="utf-8")
-        except OSError:
-            return None
-    return None
+    if not is_template_key(name):
+        return None
+
+    # Just try to open: a miss surfaces as FileNotFoundError, saving a stat()
+    try:
+        # Read-once workload: unbuffered binary read, decoded in one go
+        with open(get_cache_path(name), "rb", buffering=0) as f:
+            return f.read().decode("utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
 
 
-def save_to_cache(name: str, content: str) -> None:
+def format_size(size: int) -> str:
+    """
+    Format a byte count for display.
+
+    Args:
+        size: Size in bytes.
+        
+    Returns:
+        Human-readable size, e.g. '512 B' or '3.2 KB'.
+    """
+    return f"{size / 1024:.1f} KB" if size >= 1024 else f"{size} B"
+
+
+def load_cache_meta(name: str) -> dict:
+    """
+    Load the HTTP metadata stored alongside a cached template.
+
+    Args:
+        name: Template name.
+        
+    Returns:
+        Dictionary with optional 'name', 'url', 'etag', 'last_modified' and
+        'fetched_at' keys (empty if no valid sidecar exists).
+    """
+    if not is_template_key(name):
+        return {}
+
+    try:
+        with open(get_cache_meta_path(name), "rb", buffering=0) as f:
+            meta = json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def save_cache_meta(name: str, meta: dict) -> None:
+    """
+    Save the metadata sidecar for a cached template.
+
+    Args:
+        name: Template name.
+        meta: Metadata to store; an empty dict removes the sidecar.
+        
+    Raises:
+        OSError: If the sidecar cannot be written or removed.
+    """
+    meta_path = get_cache_meta_path(name)
+    if meta:
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    elif meta_path.exists():
+        # Stale validators would pair a new body with an old ETag
+        meta_path.unlink()
+
+
+def save_to_cache(name: str, content: str, meta: Optional[dict] = None) -> None:
     """
     Save template content to cache.
-    
+
     Args:
         name: Template name.
         content: Template content to cache.
+        meta: Optional metadata: the display 'name', the source 'url', the
+            'etag' / 'last_modified' validators used to revalidate the cached
+            copy and the 'fetched_at' timestamp of the last download.
     """
+    if not is_template_key(name):
+        # Never write outside the cache directory
+        return
+
     try:
         ensure_cache_dir()
-        cache_path = get_cache_path(name)
-        cache_path.write_text(content, encoding="utf-8")
+        # Drop the old validators, then replace the body atomically, then
+        # write the new validators: an interrupted save can never pair a body
+        # with validators that describe something else
+        save_cache_meta(name, {})
+        write_atomic(get_cache_path(name), content.encode("utf-8"))
+        if meta:
+            save_cache_meta(name, meta)
     except OSError:
         # Silent fail - caching is optional
         pass
 
 
+@contextmanager
+def atomic_open(path: Path, buffering: int = IO_BUFFER_SIZE) -> Iterator[IO[bytes]]:
+    """
+    Open a temporary sibling of a file for binary writing, then move it in place.
+
+    The data is written to a temporary file in the same directory. That file
+    replaces the destination with os.replace() only when the block exits
+    cleanly, so readers see either the old file or the complete new one,
+    never a truncated write. If the block raises, the temporary file is
+    removed. No fsync is issued; rename atomicity is all we need.
+
+    Args:
+        path: Destination file path.
+        buffering: Buffer size passed to open() (0 for unbuffered).
+        
+    Yields:
+        The temporary file object.
+        
+    Raises:
+        OSError: If the write or rename fails.
+    """
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    try:
+        with open(tmp_path, "wb", buffering=buffering) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def write_atomic(path: Path, content: bytes) -> None:
+    """
+    Write bytes to a file atomically (see atomic_open).
+
+    Args:
+        path: Destination file path.
+        content: Raw content to write.
+        
+    Raises:
+        OSError: If the write or rename fails.
+    """
+    with atomic_open(path) as f:
+        f.write(content)
+
+
+def load_registry_cache() -> Optional[dict]:
+    """
+    Load the remote registry from the on-disk cache.
+
+    Returns:
+        Parsed registry data if the cache exists and is valid JSON, None otherwise.
+    """
+    try:
+        # json.loads() takes the raw bytes directly, no separate decode pass
+        with open(get_registry_cache_path(), "rb", buffering=0) as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def save_registry_cache(content: bytes, etag: Optional[str]) -> None:
+    """
+    Save the raw remote registry and its ETag to the cache.
+
+    Args:
+        content: Raw rules.json body as returned by the server.
+        etag: ETag header of the response, if any.
+    """
+    try:
+        ensure_cache_dir()
+        write_atomic(get_registry_cache_path(), content)
+        etag_path = get_cache_dir() / REGISTRY_ETAG_FILENAME
+        if etag:
+            write_atomic(etag_path, etag.encode("utf-8"))
+        elif etag_path.exists():
+            etag_path.unlink()
+    except OSError:
+        # Silent fail - caching is optional
+        pass
+
+
+def is_registry_cache_fresh() -> bool:
+    """Check whether the cached registry is younger than REGISTRY_CACHE_TTL."""
+    try:
+        age = time.time() - get_registry_cache_path().stat().st_mtime
+    except OSError:
+        return False
+    return age < REGISTRY_CACHE_TTL
+
+
+def fetch_registry() -> Optional[dict]:
+    """
+    Fetch the remote registry, revalidating the cached copy when possible.
+
+    If a cached copy with a stored ETag exists, the request is sent with
+    If-None-Match so an unchanged registry costs only a 304 response.
+
+    Returns:
+        Parsed registry data, or the stale cached copy (None if there is
+        none) when the network fails or the response is invalid.
+    """
+    import requests
+
+    cached = load_registry_cache()
+    headers = {}
+    if cached is not None:
+        try:
+            etag_path = get_cache_dir() / REGISTRY_ETAG_FILENAME
+            headers["If-None-Match"] = etag_path.read_text(encoding="utf-8").strip()
+        except OSError:
+            pass
+
+    try:
+        response = get_session().get(
+            REMOTE_REGISTRY_URL, headers=headers, timeout=REQUEST_TIMEOUT
+        )
+        if response.status_code == 304 and cached is not None:
+            # Unchanged upstream: restart the TTL window on the cached copy
+            try:
+                os.utime(get_registry_cache_path())
+            except OSError:
+                pass
+            return cached
+        response.raise_for_status()
+        # Parse straight from bytes instead of decoding to str first
+        data = json.loads(response.content)
+    except (requests.RequestException, ValueError):
+        # Silent fallback: network error, timeout, or invalid JSON
+        return cached
+
+    remote = data.get("templates") if isinstance(data, dict) else None
+    if not isinstance(remote, dict):
+        return cached
+
+    save_registry_cache(response.content, response.headers.get("ETag"))
+    return data
+
+
+@lru_cache(maxsize=1)
 def get_registry() -> dict:
     """
     Fetch the template registry from remote source with offline fallback.
-    
+
     Attempts to fetch the latest templates from the remote rules.json.
     If successful, merges with local templates (remote takes priority).
-    If network fails (offline/timeout), returns local templates silently.
-    
+    If network fails (offline/timeout), falls back to the last cached
+    registry, or to local templates silently.
+
+    The remote registry is cached on disk for REGISTRY_CACHE_TTL seconds,
+    and the merged registry is memoized for the lifetime of the process;
+    call ``get_registry.cache_clear()`` to force a re-fetch.
+
     Returns:
         Dictionary of all available templates (local + remote merged).
     """
     # Start with local templates as the base
     all_templates = TEMPLATES.copy()
-    
+
+    data = load_registry_cache() if is_registry_cache_fresh() else None
+    if data is None:
+        data = fetch_registry()
+
+    # Validate structure and merge remote templates
+    remote = data.get("templates") if isinstance(data, dict) else None
+    if isinstance(remote, dict):
+        # Remote templates override local ones if keys conflict
+        all_templates.update(remote)
+
+    return all_templates
+
+
+@lru_cache(maxsize=1)
+def get_registry_sorted_items() -> tuple:
+    """
+    Get the merged registry as (key, template) pairs sorted by key.
+
+    Sorted once per process alongside the memoized registry.
+
+    Returns:
+        Tuple of (key, template) pairs in key order.
+    """
+    return tuple(sorted(get_registry().items()))
+
+
+def get_registry_async() -> "Future[dict]":
+    """
+    Start fetching the template registry in a background thread.
+
+    The worker is a daemon thread, so a slow registry request never delays
+    exit when the caller ends up not needing the result.
+
+    Returns:
+        A future resolving to the result of get_registry().
+    """
+    import threading
+    from concurrent.futures import Future
+
+    future: "Future[dict]" = Future()
+
+    def worker() -> None:
+        try:
+            future.set_result(get_registry())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=worker, daemon=True).start()
+    return future
+
+
+def get_installed_version() -> Optional[str]:
+    """
+    Get the installed version of cursor-setup from its package metadata.
+
+    Reads the dist-info on disk rather than the running module, so it also
+    reflects what a pip run in a subprocess just installed.
+
+    Returns:
+        The installed version string, or None if it cannot be determined.
+    """
     try:
-        response = requests.get(REMOTE_REGISTRY_URL, timeout=REQUEST_TIMEOUT)
+        from importlib.metadata import version
+        return version("cursor-setup")
+    except Exception:
+        return None
+
+
+def get_latest_version() -> Optional[str]:
+    """
+    Get the latest cursor-setup version published on PyPI.
+
+    Always asks PyPI: the only caller is the explicit `upgrade` command,
+    which must never report a stale answer.
+
+    Returns:
+        The latest version string, or None if PyPI cannot be reached.
+    """
+    import requests
+
+    try:
+        response = get_session().get(PYPI_PACKAGE_URL, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        data = response.json()
-        
-        # Validate structure and merge remote templates
-        if isinstance(data, dict) and "templates" in data:
-            remote_templates = data["templates"]
-            # Remote templates override local ones if keys conflict
-            all_templates.update(remote_templates)
-            
-    except (requests.RequestException, ValueError, KeyError):
-        # Silent fallback: network error, timeout, or invalid JSON
-        # Just use local templates without any error message
-        pass
-    
-    return all_templates
+        latest_version = json.loads(response.content)["info"]["version"]
+    except (requests.RequestException, ValueError, KeyError, TypeError):
+        return None
+    return latest_version if isinstance(latest_version, str) else None
 
 
-def download_from_url(url: str) -> str:
+def download_template(name: str, template: dict) -> str:
     """
-    Download content from a URL.
-    
+    Download a remote template, revalidating the cached copy when possible.
+
+    If the template is already cached with an ETag or Last-Modified value
+    from the same URL, the request is conditional and a 304 response reuses
+    the cached body. Fresh downloads are saved to the cache together with
+    their source URL, validators and the template's display name.
+
     Args:
-        url: The URL to download content from.
+        name: Template name (cache key).
+        template: Registry entry of the template (must have a 'url' key).
         
     Returns:
-        The text content of the response.
+        The template content.
         
     Raises:
         requests.RequestException: If download fails.
     """
-    response = requests.get(url, timeout=10)  # Longer timeout for direct downloads
+    cached_content = load_from_cache(name)
+    meta = load_cache_meta(name) if cached_content is not None else {}
+    # Validators only describe the URL they came from; if the registry moved
+    # the template, a 304 from the new URL must not confirm the old body
+    revalidate = bool(meta) and meta.get("url") == template["url"]
+    headers = {}
+    if revalidate:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = get_session().get(template["url"], headers=headers, timeout=10)
+    if response.status_code == 304 and revalidate and cached_content is not None:
+        # Record the revalidation (and refresh the display name)
+        try:
+            save_cache_meta(
+                name,
+                {**meta, "name": template.get("name"), "fetched_at": time.time()},
+            )
+        except OSError:
+            pass
+        return cached_content
     response.raise_for_status()
-    return response.text
+
+    content = response.text
+    meta = {
+        key: value
+        for key, value in (
+            ("name", template.get("name")),
+            ("url", template["url"]),
+            ("etag", response.headers.get("ETag")),
+            ("last_modified", response.headers.get("Last-Modified")),
+            ("fetched_at", time.time()),
+        )
+        if value
+    }
+    save_to_cache(name, content, meta)
+    return content
 
 
-def write_cursorrules(content: str, force: bool = False) -> Path:
+def download_to_path(url: str, dest: Path) -> None:
     """
-    Write content to .cursorrules file.
-    
+    Stream content from a URL straight into a file.
+
+    The body is written chunk by chunk without being decoded to text,
+    through atomic_open(), so a failed download never leaves a truncated
+    file behind.
+
+    Args:
+        url: The URL to download content from.
+        dest: Destination file path.
+        
+    Raises:
+        requests.RequestException: If download fails.
+        OSError: If the file cannot be written.
+    """
+    with get_session().get(url, stream=True, timeout=10) as response:
+        response.raise_for_status()
+        with atomic_open(dest, buffering=0) as f:
+            for chunk in response.iter_content(chunk_size=65536):
+                f.write(chunk)
+
+
+def prepare_cursorrules_path(force: bool = False) -> Path:
+    """
+    Resolve the .cursorrules path, asking before overwriting an existing file.
+
     Args:
-        content: The content to write to the file.
         force: If True, overwrite without asking.
-    
+
     Returns:
-        The path to the created file.
+        The path to write the .cursorrules file to.
         
     Raises:
-        typer.Exit: If user cancels overwrite or write fails.
+        typer.Exit: If user cancels overwrite.
     """
+    console = get_console()
     cursorrules_path = Path.cwd() / CURSORRULES_FILENAME
-    
+
     # Check if .cursorrules already exists
     if cursorrules_path.exists() and not force:
         console.print(
@@ -168,23 +633,48 @@ def write_cursorrules(content: str, force: bool = False) -> Path:
         if not overwrite:
             console.print("\n[dim]Operation cancelled.[/dim]\n")
             raise typer.Exit(code=0)
-    
-    # Write the content
+
+    return cursorrules_path
+
+
+def write_cursorrules(content: str, force: bool = False) -> Path:
+    """
+    Write content to .cursorrules file.
+
+    Args:
+        content: The content to write to the file.
+        force: If True, overwrite without asking.
+
+    Returns:
+        The path to the created file.
+        
+    Raises:
+        typer.Exit: If user cancels overwrite or write fails.
+    """
+    cursorrules_path = prepare_cursorrules_path(force)
+
+    # Write the content atomically, encoded once (no TextIOWrapper layer)
     try:
-        cursorrules_path.write_text(content, encoding="utf-8")
+        write_atomic(cursorrules_path, content.encode("utf-8"))
     except OSError as e:
-        console.print(f"\n[red]❌ Error writing file:[/red] {e}\n")
+        get_console().print(f"\n[red]❌ Error writing file:[/red] {e}\n")
         raise typer.Exit(code=1)
-    
+
     return cursorrules_path
 
 
-@app.command()
-def list() -> None:
+@app.command(name="list")
+def list_templates() -> None:
     """List all available cursor rule templates."""
-    # Fetch all templates (local + remote merged)
-    all_templates = get_registry()
-    
+    from rich.console import Group
+    from rich.table import Table
+    from rich.text import Text
+
+    console = get_console()
+
+    # Fetch all templates (local + remote merged), sorted by key
+    sorted_templates = get_registry_sorted_items()
+
     table = Table(
         title="📚 Available Cursor Rule Templates",
         show_header=True,
@@ -196,21 +686,23 @@ def list() -> None:
     table.add_column("Name", style="green")
     table.add_column("Description", style="white")
 
-    for key, template in sorted(all_templates.items()):
+    for key, template in sorted_templates:
         table.add_row(key, template["name"], template["description"])
 
-    console.print()
-    console.print(table)
-    console.print()
-    console.print(
-        "[dim]Usage: cursor-setup install <template>[/dim]",
-        justify="center",
-    )
-    console.print(
-        "[dim]Pro tip: cursor-setup install --url <link> for custom rules[/dim]",
-        justify="center",
-    )
-    console.print()
+    # render_str() keeps the highlighting console.print(str) would apply, but
+    # its highlighted copy drops justify, so center the returned Text directly
+    footer = [
+        console.render_str(line)
+        for line in (
+            "[dim]Usage: cursor-setup install <template>[/dim]",
+            "[dim]Pro tip: cursor-setup install --url <link> for custom rules[/dim]",
+        )
+    ]
+    for line in footer:
+        line.justify = "center"
+
+    # Render everything in one print call (one write, one lock acquisition)
+    console.print(Group(Text(""), table, Text(""), *footer, Text("")))
 
 
 @app.command()
@@ -237,115 +729,166 @@ def install(
 ) -> None:
     """
     Install a cursor rule template to the current directory.
-    
+
     Examples:
         cursor-setup install python
         cursor-setup install --url https://raw.githubusercontent.com/.../rules.txt
         cursor-setup install python --no-cache
     """
+    from rich.console import Group
+    from rich.panel import Panel
+    from rich.text import Text
+
+    console = get_console()
+
     # Validate: either name or url must be provided, but not both
     if url and name:
         console.print(
             "\n[red]❌ Error:[/red] Please use either a template name OR --url, not both.\n"
         )
         raise typer.Exit(code=1)
-    
+
     if not url and not name:
         console.print(
             "\n[red]❌ Error:[/red] Please provide a template name or use --url.\n"
         )
         console.print("Examples:", style="yellow")
-        console.print("  cursor-setup install python", style="dim")
-        console.print("  cursor-setup install --url https://example.com/rule.txt", style="dim")
-        console.print()
+        console.print(
+            "  cursor-setup install python\n"
+            "  cursor-setup install --url https://example.com/rule.txt\n",
+            style="dim",
+        )
         raise typer.Exit(code=1)
-    
+
     # === URL Installation Mode ===
     if url:
+        import requests
+        
+        cursorrules_path = prepare_cursorrules_path(force)
         console.print(f"\n[cyan]🌐 Downloading from URL...[/cyan]\n")
         
         try:
-            content = download_from_url(url)
+            # Nothing to cache here, so stream straight into .cursorrules
+            download_to_path(url, cursorrules_path)
         except requests.RequestException as e:
             console.print(f"\n[red]❌ Failed to download:[/red] {e}\n")
             console.print("[dim]Check the URL and your internet connection.[/dim]")
             raise typer.Exit(code=1)
-        
-        cursorrules_path = write_cursorrules(content, force)
+        except OSError as e:
+            console.print(f"\n[red]❌ Error writing file:[/red] {e}\n")
+            raise typer.Exit(code=1)
         
         # Success message
         success_text = Text()
         success_text.append("✨ ", style="bold")
         success_text.append("Successfully installed cursor rules from URL!", style="green")
         
-        console.print()
-        console.print(Panel(success_text, border_style="green", padding=(0, 2)))
-        console.print()
-        console.print(f"[dim]Created:[/dim] [cyan]{cursorrules_path.absolute()}[/cyan]")
-        console.print()
-        return
-    
-    # === Template Name Installation Mode ===
-    all_templates = get_registry()
-    
-    if name not in all_templates:
         console.print(
-            f"\n[red]❌ Error:[/red] Template '[bold]{name}[/bold]' not found.\n"
+            Group(
+                Text(""),
+                Panel(success_text, border_style="green", padding=(0, 2)),
+                Text(""),
+                # render_str() applies the same highlighting as console.print(str)
+                console.render_str(
+                    f"[dim]Created:[/dim] [cyan]{cursorrules_path.absolute()}[/cyan]"
+                ),
+                Text(""),
+            )
         )
-        console.print("Available templates:", style="yellow")
-        for key in sorted(all_templates.keys()):
-            console.print(f"  • {key}", style="dim")
-        console.print()
-        console.print("[dim]Tip: Use --url to install from any URL[/dim]")
-        console.print()
-        raise typer.Exit(code=1)
+        return
 
-    template = all_templates[name]
-    content: Optional[str] = None
-    
-    # Check if template has a URL (remote template) or content (local template)
-    if "url" in template:
-        # Try cache first (unless --no-cache is set)
-        if not no_cache:
+    # === Template Name Installation Mode ===
+    # The cache key is known up-front, so fetch the registry in the background
+    # and only wait for it when the cache cannot serve the request.
+    registry_future = get_registry_async()
+    cached_content = None
+    display_name = None
+    if not no_cache and is_template_key(name):
+        # Without the registry, only trust cache entries that download_template()
+        # fetched or revalidated within the registry TTL; anything older waits
+        # for the registry to confirm the template still exists
+        meta = load_cache_meta(name)
+        fetched_at = meta.get("fetched_at")
+        if (
+            meta.get("name")
+            and isinstance(fetched_at, (int, float))
+            and time.time() - fetched_at < REGISTRY_CACHE_TTL
+        ):
+            display_name = meta["name"]
             cached_content = load_from_cache(name)
-            if cached_content:
-                console.print(f"\n[yellow]⚡ Loaded [bold]{template['name']}[/bold] from cache[/yellow]\n")
-                content = cached_content
+
+    if cached_content:
+        content = cached_content
+        console.print(f"\n[yellow]⚡ Loaded [bold]{display_name}[/bold] from cache[/yellow]\n")
+    else:
+        all_templates = registry_future.result()
         
-        # Cache miss or --no-cache: download from URL
-        if content is None:
-            console.print(f"\n[cyan]🌐 Fetching {template['name']} rules...[/cyan]\n")
-            try:
-                content = download_from_url(template["url"])
-                # Save to cache for next time
-                save_to_cache(name, content)
-            except requests.RequestException as e:
-                # Try fallback to cache even if --no-cache was set
+        if name not in all_templates:
+            console.print(
+                f"\n[red]❌ Error:[/red] Template '[bold]{name}[/bold]' not found.\n"
+            )
+            console.print("Available templates:", style="yellow")
+            console.print(
+                "\n".join(f"  • {key}" for key, _ in get_registry_sorted_items()),
+                style="dim",
+            )
+            console.print("\n[dim]Tip: Use --url to install from any URL[/dim]\n")
+            raise typer.Exit(code=1)
+        
+        template = all_templates[name]
+        display_name = template["name"]
+        
+        # Check if template has a URL (remote template) or content (local template)
+        if "url" in template:
+            import requests
+            
+            # The registry vouches for the name now, so any cached copy will do
+            if not no_cache:
                 cached_content = load_from_cache(name)
-                if cached_content:
-                    console.print(f"[yellow]⚠️  Network error, using cached version[/yellow]\n")
-                    content = cached_content
-                else:
-                    console.print(f"\n[red]❌ Failed to download template:[/red] {e}\n")
-                    raise typer.Exit(code=1)
-    else:
-        # Local template: use embedded content
-        content = template["content"]
-    
+            
+            if cached_content:
+                console.print(f"\n[yellow]⚡ Loaded [bold]{display_name}[/bold] from cache[/yellow]\n")
+                content = cached_content
+            else:
+                # Cache miss or --no-cache: download from URL
+                console.print(f"\n[cyan]🌐 Fetching {display_name} rules...[/cyan]\n")
+                try:
+                    # Revalidates the cached copy and saves fresh content for next time
+                    content = download_template(name, template)
+                except requests.RequestException as e:
+                    # Try fallback to cache even if --no-cache was set
+                    cached_content = load_from_cache(name)
+                    if cached_content:
+                        console.print(f"[yellow]⚠️  Network error, using cached version[/yellow]\n")
+                        content = cached_content
+                    else:
+                        console.print(f"\n[red]❌ Failed to download template:[/red] {e}\n")
+                        raise typer.Exit(code=1)
+        else:
+            # Local template: use embedded content
+            content = template["content"]
+
     cursorrules_path = write_cursorrules(content, force)
 
     # Success message
     success_text = Text()
     success_text.append("✨ ", style="bold")
     success_text.append("Successfully initialized cursor rules for ", style="green")
-    success_text.append(template["name"], style="bold green")
+    success_text.append(display_name, style="bold green")
     success_text.append("!", style="green")
 
-    console.print()
-    console.print(Panel(success_text, border_style="green", padding=(0, 2)))
-    console.print()
-    console.print(f"[dim]Created:[/dim] [cyan]{cursorrules_path.absolute()}[/cyan]")
-    console.print()
+    console.print(
+        Group(
+            Text(""),
+            Panel(success_text, border_style="green", padding=(0, 2)),
+            Text(""),
+            # render_str() applies the same highlighting as console.print(str)
+            console.render_str(
+                f"[dim]Created:[/dim] [cyan]{cursorrules_path.absolute()}[/cyan]"
+            ),
+            Text(""),
+        )
+    )
 
 
 @app.command()
@@ -356,22 +899,31 @@ def show(
     ),
 ) -> None:
     """Preview a cursor rule template without installing it."""
+    from rich.console import Group
+    from rich.panel import Panel
+    from rich.text import Text
+
+    console = get_console()
+
     all_templates = get_registry()
-    
+
     if name not in all_templates:
         console.print(
             f"\n[red]❌ Error:[/red] Template '[bold]{name}[/bold]' not found.\n"
         )
         console.print("Available templates:", style="yellow")
-        for key in sorted(all_templates.keys()):
-            console.print(f"  • {key}", style="dim")
-        console.print()
+        console.print(
+            "\n".join(f"  • {key}" for key, _ in get_registry_sorted_items()) + "\n",
+            style="dim",
+        )
         raise typer.Exit(code=1)
 
     template = all_templates[name]
-    
+
     # Check if template has a URL (remote) or content (local)
     if "url" in template:
+        import requests
+        
         # Try cache first
         cached_content = load_from_cache(name)
         if cached_content:
@@ -380,31 +932,40 @@ def show(
         else:
             console.print(f"\n[cyan]🌐 Fetching {template['name']} preview...[/cyan]\n")
             try:
-                content = download_from_url(template["url"])
-                save_to_cache(name, content)
+                content = download_template(name, template)
             except requests.RequestException as e:
                 console.print(f"\n[red]❌ Failed to fetch preview:[/red] {e}\n")
                 raise typer.Exit(code=1)
     else:
         content = template["content"]
 
-    console.print()
     console.print(
-        Panel(
-            content,
-            title=f"📄 {template['name']} Template",
-            border_style="cyan",
-            padding=(1, 2),
+        Group(
+            Text(""),
+            Panel(
+                content,
+                title=f"📄 {template['name']} Template",
+                border_style="cyan",
+                padding=(1, 2),
+            ),
+            Text(""),
         )
     )
-    console.print()
 
 
 @app.command()
 def upgrade() -> None:
     """Upgrade cursor-setup to the latest version."""
+    import subprocess
+
+    from rich.console import Group
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.text import Text
+
+    console = get_console()
     console.print()
-    
+
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -413,41 +974,56 @@ def upgrade() -> None:
     ) as progress:
         progress.add_task(description="[cyan]Checking for updates...[/cyan]", total=None)
         
-        try:
-            # Run pip install --upgrade
-            result = subprocess.run(
-                [sys.executable, "-m", "pip", "install", "--upgrade", "cursor-setup"],
-                capture_output=True,
-                text=True,
-                timeout=60,
-            )
-            
-            if result.returncode != 0:
-                console.print(f"[red]❌ Upgrade failed:[/red]\n{result.stderr}")
-                raise typer.Exit(code=1)
+        # Ask PyPI first so an up-to-date install never spawns pip
+        latest_version = get_latest_version()
+        up_to_date = latest_version is not None and latest_version == __version__
+        
+        if not up_to_date:
+            try:
+                # Run pip install --upgrade
+                result = subprocess.run(
+                    [sys.executable, "-m", "pip", "install", "--upgrade", "cursor-setup"],
+                    capture_output=True,
+                    text=True,
+                    timeout=60,
+                )
                 
-        except subprocess.TimeoutExpired:
-            console.print("[red]❌ Upgrade timed out. Please try again.[/red]")
-            raise typer.Exit(code=1)
-        except FileNotFoundError:
-            console.print("[red]❌ pip not found. Please ensure pip is installed.[/red]")
-            raise typer.Exit(code=1)
-    
-    # Get new version
-    try:
-        from importlib.metadata import version
-        new_version = version("cursor-setup")
-    except Exception:
-        new_version = "unknown"
-    
+                if result.returncode != 0:
+                    console.print(f"[red]❌ Upgrade failed:[/red]\n{result.stderr}")
+                    raise typer.Exit(code=1)
+                    
+            except subprocess.TimeoutExpired:
+                console.print("[red]❌ Upgrade timed out. Please try again.[/red]")
+                raise typer.Exit(code=1)
+            except FileNotFoundError:
+                console.print("[red]❌ pip not found. Please ensure pip is installed.[/red]")
+                raise typer.Exit(code=1)
+
+    # pip may have installed something other than PyPI's latest (or nothing,
+    # e.g. because of requires-python or constraints): read what is on disk now
+    new_version = __version__ if up_to_date else get_installed_version()
+
+    if new_version == __version__:
+        console.print(
+            f"[green]✨ cursor-setup is already up to date "
+            f"([bold]v{__version__}[/bold])[/green]\n"
+        )
+        return
+
+    new_version = new_version or "unknown"
+
     success_text = Text()
     success_text.append("✨ ", style="bold")
     success_text.append("Successfully upgraded to ", style="green")
     success_text.append(f"v{new_version}", style="bold green")
     success_text.append("!", style="green")
-    
-    console.print(Panel(success_text, border_style="green", padding=(0, 2)))
-    console.print()
+
+    console.print(
+        Group(
+            Panel(success_text, border_style="green", padding=(0, 2)),
+            Text(""),
+        )
+    )
 
 
 @app.command()
@@ -459,11 +1035,18 @@ def cache(
     ),
 ) -> None:
     """Manage the template cache."""
+    from rich.table import Table
+
+    console = get_console()
+    cache_dir = get_cache_dir()
+
     if clear:
-        if CACHE_DIR.exists():
+        if cache_dir.exists():
             import shutil
             try:
-                shutil.rmtree(CACHE_DIR)
+                shutil.rmtree(cache_dir)
+                get_registry.cache_clear()
+                get_registry_sorted_items.cache_clear()
                 console.print("\n[green]✨ Cache cleared successfully![/green]\n")
             except OSError as e:
                 console.print(f"\n[red]❌ Failed to clear cache:[/red] {e}\n")
@@ -471,42 +1054,50 @@ def cache(
         else:
             console.print("\n[dim]Cache is already empty.[/dim]\n")
         return
-    
+
     # Show cache info
     console.print()
-    if not CACHE_DIR.exists():
+    # One directory scan; DirEntry caches stat() results from the scan
+    suffix = ".cursorrules"
+    try:
+        with os.scandir(cache_dir) as it:
+            cached_entries = sorted(
+                (
+                    entry
+                    for entry in it
+                    if entry.is_file() and entry.name.endswith(suffix)
+                ),
+                key=lambda entry: entry.name,
+            )
+    except FileNotFoundError:
         console.print("[dim]No cache directory found.[/dim]")
-        console.print(f"[dim]Cache location: {CACHE_DIR}[/dim]\n")
+        console.print(f"[dim]Cache location: {cache_dir}[/dim]\n")
         return
-    
-    cached_files = list(CACHE_DIR.glob("*.cursorrules"))
-    
-    if not cached_files:
+
+    if not cached_entries:
         console.print("[dim]Cache is empty.[/dim]")
-        console.print(f"[dim]Cache location: {CACHE_DIR}[/dim]\n")
+        console.print(f"[dim]Cache location: {cache_dir}[/dim]\n")
         return
-    
+
     table = Table(
         title="📦 Cached Templates",
         show_header=True,
         header_style="bold magenta",
         border_style="cyan",
     )
-    
+
     table.add_column("Template", style="cyan")
     table.add_column("Size", style="green")
-    
+
     total_size = 0
-    for cache_file in sorted(cached_files):
-        size = cache_file.stat().st_size
+    for entry in cached_entries:
+        size = entry.stat().st_size
         total_size += size
-        size_str = f"{size / 1024:.1f} KB" if size >= 1024 else f"{size} B"
-        table.add_row(cache_file.stem, size_str)
-    
+        table.add_row(entry.name[: -len(suffix)], format_size(size))
+
     console.print(table)
-    total_str = f"{total_size / 1024:.1f} KB" if total_size >= 1024 else f"{total_size} B"
-    console.print(f"\n[dim]Total size: {total_str}[/dim]")
-    console.print(f"[dim]Location: {CACHE_DIR}[/dim]")
+    console.print(f"\n[dim]Total size: {format_size(total_size)}[/dim]")
+    console.print(f"[dim]Location: {cache_dir}[/dim]")
     console.print("\n[dim]Use --clear to remove all cached templates[/dim]\n")
 
 